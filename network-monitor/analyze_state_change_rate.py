@@ -4,39 +4,92 @@ Analyze state change rate over time for network monitor devices
 Detects periods of instability (frequent state changes) and trend changes
 """
 
+import mmap
 import os
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 from collections import defaultdict
+from itertools import chain
 from typing import Dict, List, Tuple
-import statistics
+from math import fsum, sqrt
+
+# Optional: numpy vectorizes the window counting and stats kernels
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+def mean(values: List[float]) -> float:
+    """Fast mean - statistics.mean is ~50x slower on floats"""
+    if np is not None:
+        return float(np.mean(values))
+    return fsum(values) / len(values)
+
+def stdev(values: List[float]) -> float:
+    """Fast sample standard deviation"""
+    if len(values) < 2:
+        return 0.0
+    if np is not None:
+        return float(np.std(values, ddof=1))
+    m = fsum(values) / len(values)
+    return sqrt(fsum((v - m) ** 2 for v in values) / (len(values) - 1))
+
+def _parse_one(filepath: str) -> List[Tuple[datetime, str, str]]:
+    """Parse one device file (module-level so worker processes can run it)"""
+    state_changes = []
+
+    # Timestamps repeat across devices (discovery scans stamp many devices
+    # with the same time), so parse each unique string once. The same trick
+    # dedupes the mac/status strings, which repeat on almost every line.
+    ts_cache: Dict[bytes, datetime] = {}
+    str_cache: Dict[bytes, str] = {}
+
+    try:
+        # Binary read + bytes split skips UTF-8 decoding of whole files;
+        # only the three fields we keep get decoded (via the caches)
+        with open(filepath, 'rb') as f:
+            try:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    data = mm.read()
+            except ValueError:
+                # mmap can't map empty files
+                data = b''
+
+        for line in data.splitlines():
+            if not line:
+                continue
+
+            parts = line.split(b',')
+            if len(parts) >= 4:
+                timestamp = ts_cache.get(parts[0])
+                if timestamp is None:
+                    timestamp = datetime.fromisoformat(parts[0].decode())
+                    ts_cache[parts[0]] = timestamp
+                mac = str_cache.get(parts[2])
+                if mac is None:
+                    mac = str_cache[parts[2]] = parts[2].decode()
+                status = str_cache.get(parts[3])
+                if status is None:
+                    status = str_cache[parts[3]] = parts[3].decode()
+                state_changes.append((timestamp, mac, status))
+    except Exception as e:
+        print(f"Error reading {os.path.basename(filepath)}: {e}")
+
+    return state_changes
 
 def parse_device_files(devices_dir: str) -> List[Tuple[datetime, str, str]]:
     """
     Parse all device files and extract state changes
     Returns: [(timestamp, mac, status), ...]
     """
-    state_changes = []
-
-    for filename in os.listdir(devices_dir):
-        filepath = os.path.join(devices_dir, filename)
-        if not os.path.isfile(filepath):
-            continue
+    filepaths = [os.path.join(devices_dir, filename)
+                 for filename in os.listdir(devices_dir)
+                 if os.path.isfile(os.path.join(devices_dir, filename))]
 
-        try:
-            with open(filepath, 'r') as f:
-                for line in f:
-                    line = line.strip()
-                    if not line:
-                        continue
-
-                    parts = line.split(',')
-                    if len(parts) >= 4:
-                        timestamp = datetime.fromisoformat(parts[0])
-                        mac = parts[2]
-                        status = parts[3]
-                        state_changes.append((timestamp, mac, status))
-        except Exception as e:
-            print(f"Error reading {filename}: {e}")
+    # Files are independent, so parse them across worker processes
+    with ProcessPoolExecutor() as executor:
+        chunks = executor.map(_parse_one, filepaths, chunksize=4)
+        state_changes = list(chain.from_iterable(chunks))
 
     # Sort by timestamp
     state_changes.sort(key=lambda x: x[0])
@@ -61,16 +114,43 @@ def calculate_rate_by_window(state_changes: List[Tuple[datetime, str, str]],
     # Slide window by 1/4 of window size for overlap
     step_delta = timedelta(minutes=window_minutes // 4)
 
+    timestamps = [sc[0] for sc in state_changes]
+    actual_hours = window_minutes / 60.0
+
+    if np is not None:
+        # Vectorized: two searchsorted calls count every window at once
+        ts_us = np.array(timestamps, dtype='datetime64[us]').astype(np.int64)
+        step_us = step_delta // timedelta(microseconds=1)
+        window_us = window_delta // timedelta(microseconds=1)
+        starts = np.arange(ts_us[0], ts_us[-1] + 1, step_us, dtype=np.int64)
+        counts = (np.searchsorted(ts_us, starts + window_us, side='left')
+                  - np.searchsorted(ts_us, starts, side='left'))
+        return [(start_time + i * step_delta,
+                 int(count) / actual_hours if actual_hours > 0 else 0,
+                 int(count))
+                for i, count in enumerate(counts)]
+
+    # Fallback: state_changes is sorted, so slide two pointers instead of
+    # re-scanning every event for every window: O(N + W) rather than O(N * W)
+    n = len(timestamps)
+    left = 0
+    right = 0
+
     current = start_time
     while current <= end_time:
         window_end = current + window_delta
 
-        # Count changes in this window
-        changes_in_window = sum(1 for ts, _, _ in state_changes
-                               if current <= ts < window_end)
+        # Advance pointers to bracket [current, window_end)
+        while left < n and timestamps[left] < current:
+            left += 1
+        if right < left:
+            right = left
+        while right < n and timestamps[right] < window_end:
+            right += 1
+
+        changes_in_window = right - left
 
         # Calculate rate as changes per hour
-        actual_hours = window_minutes / 60.0
         rate = changes_in_window / actual_hours if actual_hours > 0 else 0
 
         rates.append((current, rate, changes_in_window))
@@ -88,8 +168,22 @@ def detect_anomalies(rates: List[Tuple[datetime, float, int]],
         return []
 
     rate_values = [r[1] for r in rates]
-    mean_rate = statistics.mean(rate_values)
-    stdev_rate = statistics.stdev(rate_values) if len(rate_values) > 1 else 0
+
+    if np is not None:
+        # Compute every Z-score in one vectorized pass and index the outliers
+        rate_arr = np.fromiter(rate_values, dtype=np.float64, count=len(rate_values))
+        stdev_rate = float(rate_arr.std(ddof=1))
+        if stdev_rate <= 0:
+            return []
+
+        z_scores = (rate_arr - rate_arr.mean()) / stdev_rate
+        outliers = np.nonzero(np.abs(z_scores) > threshold_stdev)[0]
+        return [(rates[i][0], rates[i][1],
+                 "High instability" if z_scores[i] > 0 else "Unusually stable")
+                for i in outliers]
+
+    mean_rate = mean(rate_values)
+    stdev_rate = stdev(rate_values)
 
     anomalies = []
     for timestamp, rate, count in rates:
@@ -116,8 +210,8 @@ def detect_trends(rates: List[Tuple[datetime, float, int]],
     first_half = [r[1] for r in rates[:midpoint]]
     second_half = [r[1] for r in rates[midpoint:]]
 
-    mean_first = statistics.mean(first_half)
-    mean_second = statistics.mean(second_half)
+    mean_first = mean(first_half)
+    mean_second = mean(second_half)
 
     percent_change = ((mean_second - mean_first) / mean_first * 100) if mean_first > 0 else 0
 
@@ -145,13 +239,15 @@ def analyze_per_device(state_changes: List[Tuple[datetime, str, str]]) -> Dict[s
         if len(changes) < 2:
             continue
 
-        # Calculate time between state changes
-        intervals = []
-        for i in range(1, len(changes)):
-            interval = (changes[i][0] - changes[i-1][0]).total_seconds()
-            intervals.append(interval)
-
-        mean_interval = statistics.mean(intervals) if intervals else 0
+        # Calculate mean time between state changes
+        if np is not None:
+            # One np.diff over the timestamps instead of a per-pair loop
+            ts = np.array([c[0] for c in changes], dtype='datetime64[us]')
+            mean_interval = float(np.diff(ts).astype(np.int64).mean()) / 1e6
+        else:
+            intervals = [(changes[i][0] - changes[i-1][0]).total_seconds()
+                         for i in range(1, len(changes))]
+            mean_interval = mean(intervals) if intervals else 0
 
         device_stats[mac] = {
             "total_changes": len(changes),
@@ -195,11 +291,35 @@ def main():
     if rates:
         print(f"\nRate statistics:")
         rate_values = [r[1] for r in rates]
-        print(f"  Min rate:  {min(rate_values):.2f} changes/hour")
-        print(f"  Max rate:  {max(rate_values):.2f} changes/hour")
-        print(f"  Mean rate: {statistics.mean(rate_values):.2f} changes/hour")
+
+        # Single pass over the rates instead of min/max/mean/stdev traversals
+        if np is not None:
+            arr = np.fromiter(rate_values, dtype=np.float64, count=len(rate_values))
+            min_rate, max_rate = float(arr.min()), float(arr.max())
+            mean_rate = float(arr.mean())
+            stdev_rate = float(arr.std(ddof=1)) if len(rate_values) > 1 else 0.0
+        else:
+            # Welford's online update gives mean and variance in one sweep
+            min_rate = max_rate = rate_values[0]
+            n = 0
+            mean_rate = 0.0
+            m2 = 0.0
+            for value in rate_values:
+                if value < min_rate:
+                    min_rate = value
+                if value > max_rate:
+                    max_rate = value
+                n += 1
+                delta = value - mean_rate
+                mean_rate += delta / n
+                m2 += delta * (value - mean_rate)
+            stdev_rate = sqrt(m2 / (n - 1)) if n > 1 else 0.0
+
+        print(f"  Min rate:  {min_rate:.2f} changes/hour")
+        print(f"  Max rate:  {max_rate:.2f} changes/hour")
+        print(f"  Mean rate: {mean_rate:.2f} changes/hour")
         if len(rate_values) > 1:
-            print(f"  Std dev:   {statistics.stdev(rate_values):.2f} changes/hour")
+            print(f"  Std dev:   {stdev_rate:.2f} changes/hour")
 
     # Detect trend
     print("\n=== Trend Analysis ===")
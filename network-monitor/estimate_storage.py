@@ -6,42 +6,63 @@ Estimate how long it will take to accumulate a given amount of data
 import os
 from datetime import datetime, timedelta
 
-def get_directory_size(path):
-    """Calculate total size of all files in directory"""
+def count_lines(filepath):
+    """Count newlines in 1MB binary chunks - bytes.count runs at memchr speed"""
     total = 0
-    for filename in os.listdir(path):
-        filepath = os.path.join(path, filename)
-        if os.path.isfile(filepath):
-            total += os.path.getsize(filepath)
+    with open(filepath, 'rb') as f:
+        while True:
+            chunk = f.read(1 << 20)
+            if not chunk:
+                break
+            total += chunk.count(b'\n')
     return total
 
-def get_time_range(devices_dir):
+def list_device_files(devices_dir):
+    """Single scandir pass returning [(filepath, size_bytes), ...]"""
+    with os.scandir(devices_dir) as it:
+        return [(entry.path, entry.stat().st_size)
+                for entry in it if entry.is_file(follow_symlinks=False)]
+
+def get_time_range(filepaths):
     """Get earliest and latest timestamps from all device files"""
     earliest = None
     latest = None
 
-    for filename in os.listdir(devices_dir):
-        filepath = os.path.join(devices_dir, filename)
-        if os.path.isfile(filepath):
-            try:
-                with open(filepath, 'r') as f:
-                    lines = [line.strip() for line in f if line.strip()]
-
-                    if lines:
-                        # First line
-                        first_timestamp = lines[0].split(',')[0]
-                        first_dt = datetime.fromisoformat(first_timestamp)
-
-                        # Last line
-                        last_timestamp = lines[-1].split(',')[0]
-                        last_dt = datetime.fromisoformat(last_timestamp)
-
-                        if earliest is None or first_dt < earliest:
-                            earliest = first_dt
-                        if latest is None or last_dt > latest:
-                            latest = last_dt
-            except:
-                continue
+    # Parse each unique timestamp string once (repeated across files)
+    ts_cache = {}
+
+    def parse_ts(ts_str):
+        ts = ts_cache.get(ts_str)
+        if ts is None:
+            ts = datetime.fromisoformat(ts_str)
+            ts_cache[ts_str] = ts
+        return ts
+
+    for filepath in filepaths:
+        try:
+            with open(filepath, 'rb') as f:
+                # First line
+                first = f.readline().strip()
+                if not first:
+                    continue
+
+                # Last line: seek near the end instead of reading the whole
+                # file just to throw away everything but two timestamps
+                f.seek(0, os.SEEK_END)
+                size = f.tell()
+                f.seek(size - min(4096, size))
+                tail = f.read().splitlines()
+                last = next((l for l in reversed(tail) if l.strip()), first)
+
+                first_dt = parse_ts(first.split(b',', 1)[0].decode())
+                last_dt = parse_ts(last.split(b',', 1)[0].decode())
+
+                if earliest is None or first_dt < earliest:
+                    earliest = first_dt
+                if latest is None or last_dt > latest:
+                    latest = last_dt
+        except:
+            continue
 
     return earliest, latest
 
@@ -68,13 +89,18 @@ def main():
         print(f"Error: {devices_dir} directory not found")
         return
 
+    # One directory pass: scandir caches the stat info, and the file list
+    # is reused for the time range and line counts below
+    device_files = list_device_files(devices_dir)
+    filepaths = [path for path, _ in device_files]
+
     # Get current size
-    current_bytes = get_directory_size(devices_dir)
+    current_bytes = sum(size for _, size in device_files)
     current_kb = current_bytes / 1024
     current_mb = current_kb / 1024
 
     # Get time range
-    earliest, latest = get_time_range(devices_dir)
+    earliest, latest = get_time_range(filepaths)
 
     if not earliest or not latest:
         print("Error: Could not determine time range")
@@ -119,13 +145,9 @@ def main():
 
     print()
 
-    # Line count info
-    total_lines = 0
-    for filename in os.listdir(devices_dir):
-        filepath = os.path.join(devices_dir, filename)
-        if os.path.isfile(filepath):
-            with open(filepath, 'r') as f:
-                total_lines += sum(1 for line in f if line.strip())
+    # Line count info (the monitor never writes blank lines, so newline
+    # count == line count)
+    total_lines = sum(count_lines(filepath) for filepath in filepaths)
 
     avg_bytes_per_line = current_bytes / total_lines if total_lines > 0 else 0
     lines_per_hour = total_lines / hours if hours > 0 else 0
@@ -7,6 +7,8 @@ Uses simple text files instead of database
 
 import threading
 import time
+import socket
+import selectors
 import subprocess
 import json
 import os
@@ -20,122 +22,287 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 # Logger will be configured after loading config
 logger = logging.getLogger(__name__)
 
+# Optional: icmplib pings in-process, avoiding a fork+exec per check
+try:
+    from icmplib import ping as icmp_ping
+except ImportError:
+    icmp_ping = None
+
+# Optional: orjson parses/serializes JSON several times faster than stdlib
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _json_loads(data):
+    """Parse JSON text/bytes with orjson when available"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_dumps(obj) -> bytes:
+    """Serialize to indented JSON bytes with orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2).encode()
+
+
+# IEEE OUI registry as shipped by the ieee-data package (optional)
+IEEE_OUI_FILE = '/usr/share/ieee-data/oui.txt'
+
+# Strips MAC separators in one C-level pass (vs chained .replace calls)
+MAC_STRIP = str.maketrans('', '', ':-')
+
+# Built-in fallbacks for OUIs seen on this network
+COMMON_VENDORS = {
+    '74B6B6': 'Eero',
+    '1C6499': 'UnknownIoT',
+    '0050B6': 'UnknownDevice',
+    'AC6784': 'UnknownDevice',
+    'E4F042': 'UnknownDevice',
+}
+
 
 class MacVendorLookup:
     """Look up device manufacturer from MAC address"""
-    
-    def __init__(self):
-        self.cache = {}
+
+    def __init__(self, common_vendors: dict = None, cache_file: str = None):
+        self.cache = {}  # {oui: vendor} - devices share OUIs, so key on those
+        self.cache_file = cache_file
         self.hostname_counts = {}
-    
+        self.hostname_cache = {}  # {mac: hostname} - keeps names stable across scans
+        self._session = None  # pooled HTTP session, built on first API lookup
+
+        # Local OUI table checked before any network lookup: IEEE registry
+        # (if installed) overlaid with built-ins and config common_vendors
+        self.oui_table = self._load_ieee_oui()
+        self.oui_table.update(COMMON_VENDORS)
+        if common_vendors:
+            for prefix, vendor in common_vendors.items():
+                if not prefix.startswith('_'):
+                    self.oui_table[prefix.replace(':', '').upper()] = vendor
+
+        # Answers the online API gave in past runs, kept separate from
+        # self.cache so that failure-'Unknown's and local-table hits are
+        # never persisted, and consulted after oui_table so a stale file
+        # can't shadow the IEEE registry
+        self.api_cache = {}
+        if self.cache_file:
+            try:
+                with open(self.cache_file, 'rb') as f:
+                    self.api_cache.update(_json_loads(f.read()))
+            except (OSError, ValueError):
+                pass
+
+    def _save_cache(self):
+        """Write API-resolved vendors to the cache file (best effort)"""
+        if not self.cache_file:
+            return
+        try:
+            with open(self.cache_file, 'wb') as f:
+                f.write(_json_dumps(self.api_cache))
+        except OSError as e:
+            logger.warning(f"Could not save vendor cache: {e}")
+
+    def _load_ieee_oui(self) -> dict:
+        """Load the IEEE OUI registry into {oui: vendor}, if available"""
+        table = {}
+        try:
+            with open(IEEE_OUI_FILE, errors='ignore') as f:
+                for line in f:
+                    if '(base 16)' in line:
+                        prefix, _, vendor = line.partition('(base 16)')
+                        table[prefix.strip().upper()] = vendor.strip()
+            logger.info(f"Loaded {len(table)} vendors from {IEEE_OUI_FILE}")
+        except OSError:
+            pass
+        return table
+
+    def _get_session(self):
+        """Lazily build a pooled requests session so API lookups reuse one
+        TLS connection instead of handshaking per call (requests is optional)"""
+        if self._session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            self._session = requests.Session()
+            self._session.mount('https://', HTTPAdapter(
+                pool_connections=4, pool_maxsize=16, max_retries=2))
+        return self._session
+
     def get_vendor(self, mac: str) -> str:
         """Get vendor name from MAC address OUI"""
-        if mac in self.cache:
-            return self.cache[mac]
-        
         # Extract OUI (first 3 octets)
-        oui = mac.replace(':', '').replace('-', '').upper()[:6]
-        
-        # Try online lookup first
-        try:
-            import requests
-            response = requests.get(
-                f'https://api.maclookup.app/v2/macs/{oui}',
-                timeout=2
-            )
-            if response.status_code == 200:
-                data = response.json()
-                vendor = data.get('company', 'Unknown')
-                self.cache[mac] = vendor
-                return vendor
-        except:
-            pass
-        
-        # Fallback to common vendors
-        common_vendors = {
-            '74B6B6': 'Eero',
-            '1C6499': 'UnknownIoT',
-            '0050B6': 'UnknownDevice',
-            'AC6784': 'UnknownDevice',
-            'E4F042': 'UnknownDevice',
-        }
-        
-        vendor = common_vendors.get(oui, 'Unknown')
-        self.cache[mac] = vendor
+        oui = mac.translate(MAC_STRIP).upper()[:6]
+
+        if oui in self.cache:
+            return self.cache[oui]
+
+        # Local table first - O(1) dict hit instead of a network round-trip
+        # - then answers the API gave in earlier runs
+        vendor = self.oui_table.get(oui)
+        if vendor is None:
+            vendor = self.api_cache.get(oui)
+
+        # Online lookup only for OUIs neither source knows
+        if vendor is None:
+            try:
+                response = self._get_session().get(
+                    f'https://api.maclookup.app/v2/macs/{oui}',
+                    timeout=2
+                )
+                if response.status_code == 200:
+                    data = response.json()
+                    vendor = data.get('company', 'Unknown')
+
+                    # Persist genuine API answers only - an 'Unknown'
+                    # from a network failure shouldn't stick across
+                    # restarts
+                    self.api_cache[oui] = vendor
+                    self._save_cache()
+            except:
+                pass
+
+        if vendor is None:
+            vendor = 'Unknown'
+
+        self.cache[oui] = vendor
         return vendor
     
+    def seed_known_hostnames(self, known: Dict[str, str]):
+        """Seed {mac: hostname} mappings (from device files on startup) so
+        re-discovered devices keep their names and restarts don't mint new
+        '-N' suffixes"""
+        for mac, hostname in known.items():
+            self.hostname_cache.setdefault(mac, hostname)
+
+            # Recover the duplicate counter from a trailing '-N' suffix.
+            # Generated names end in the MAC's last4 ('GoogleInc-1234'),
+            # which can be all digits - only a short trailing number can
+            # be a duplicate counter ('GoogleInc-1234-2')
+            base, sep, suffix = hostname.rpartition('-')
+            if sep and suffix.isdigit() and len(suffix) < 4:
+                key, count = base, int(suffix)
+            else:
+                key, count = hostname, 1
+            if self.hostname_counts.get(key, 0) < count:
+                self.hostname_counts[key] = count
+
     def generate_hostname(self, mac: str, ip: str, dns_hostname: str = None) -> str:
         """Generate a friendly hostname from MAC vendor"""
+        # Re-seen MAC: reuse its name rather than bumping the counters again
+        cached = self.hostname_cache.get(mac)
+        if cached is not None:
+            return cached
+
         if dns_hostname and dns_hostname != ip:
             # Clean up DNS hostname
             clean_dns = dns_hostname.replace('.', '-').replace(' ', '-')
+            self.hostname_cache[mac] = clean_dns
             return clean_dns
-        
+
         vendor = self.get_vendor(mac)
-        last4 = mac.replace(':', '')[-4:].upper()
-        
+        last4 = mac.translate(MAC_STRIP)[-4:].upper()
+
         # Clean up vendor name for filename
         vendor_clean = vendor.replace(',', '').replace(' ', '').replace('.', '')
         base_hostname = f"{vendor_clean}-{last4}"
-        
+
         # Handle duplicates
         if base_hostname in self.hostname_counts:
             self.hostname_counts[base_hostname] += 1
-            return f"{base_hostname}-{self.hostname_counts[base_hostname]}"
+            hostname = f"{base_hostname}-{self.hostname_counts[base_hostname]}"
         else:
             self.hostname_counts[base_hostname] = 1
-            return base_hostname
+            hostname = base_hostname
+
+        self.hostname_cache[mac] = hostname
+        return hostname
 
 
 class DeviceTracker:
     """File-based device tracking"""
     
-    def __init__(self, devices_dir='devices'):
+    def __init__(self, devices_dir='devices', max_log_bytes=0, backup_count=3):
         self.devices_dir = devices_dir
+        self.max_log_bytes = max_log_bytes  # 0 = never rotate
+        self.backup_count = backup_count
         self.lock = threading.Lock()
         self.device_states = {}  # {mac: {'hostname': str, 'ip': str, 'status': str, 'last_change': datetime}}
-        
+
+        # Immutable snapshot published after every change; readers (the
+        # polling thread) take this without touching the lock
+        self._devices_snapshot = ()
+
+        # Append handles opened once per device and kept, so each state
+        # change costs one write+flush instead of open/write/close
+        self._append_handles = {}  # {filename: file object}
+
         # Create devices directory if it doesn't exist
         os.makedirs(self.devices_dir, exist_ok=True)
-        
+
         # Load existing device states
         self._load_device_states()
+        self._publish_snapshot()
     
     def _load_device_states(self):
         """Load device states from existing files"""
         if not os.path.exists(self.devices_dir):
             return
         
-        for filename in os.listdir(self.devices_dir):
-            filepath = os.path.join(self.devices_dir, filename)
-            if os.path.isfile(filepath):
-                try:
-                    with open(filepath, 'r') as f:
-                        lines = f.readlines()
-                        if lines:
-                            # Parse last line to get current state
-                            last_line = lines[-1].strip()
-                            if last_line:
-                                parts = last_line.split(',')
-                                if len(parts) >= 4:
-                                    timestamp_str = parts[0]
-                                    ip = parts[1]
-                                    mac = parts[2]
-                                    status = parts[3]
-                                    
-                                    self.device_states[mac] = {
-                                        'hostname': filename,
-                                        'ip': ip,
-                                        'status': status,
-                                        'last_change': datetime.fromisoformat(timestamp_str)
-                                    }
-                except Exception as e:
-                    logger.error(f"Error loading device state from {filename}: {e}")
+        # scandir avoids a stat() per entry, and only the tail of each log
+        # is read - startup stays O(devices), not O(total log bytes).
+        # Rotated backups (name.1, name.2, ...) are history, not devices.
+        with os.scandir(self.devices_dir) as it:
+            entries = [e for e in it
+                       if e.is_file() and not self._BACKUP_SUFFIX_RE.search(e.name)]
+
+        for entry in entries:
+            try:
+                with open(entry.path, 'rb') as f:
+                    f.seek(0, os.SEEK_END)
+                    size = f.tell()
+                    f.seek(size - min(512, size))
+                    tail = f.read().splitlines()
+
+                # Parse last non-empty line to get current state
+                last_line = next(
+                    (l for l in reversed(tail) if l.strip()), b'').decode()
+                if last_line:
+                    parts = last_line.split(',')
+                    if len(parts) >= 4:
+                        timestamp_str = parts[0]
+                        ip = parts[1]
+                        mac = parts[2]
+                        status = parts[3]
+
+                        self.device_states[mac] = {
+                            'hostname': entry.name,
+                            'ip': ip,
+                            'status': status,
+                            'last_change': datetime.fromisoformat(timestamp_str)
+                        }
+            except Exception as e:
+                logger.error(f"Error loading device state from {entry.name}: {e}")
     
+    def _publish_snapshot(self):
+        """Rebuild the read-only snapshot (call with self.lock held)"""
+        self._devices_snapshot = tuple(
+            (mac, data['ip'], data['hostname'], data['status'])
+            for mac, data in self.device_states.items())
+
+    # Anything outside word characters / hyphens gets stripped from
+    # filenames; compiled once rather than filtering char-by-char
+    _UNSAFE_CHARS_RE = re.compile(r'[^\w-]')
+
+    # Rotated log backups carry a numeric suffix (Device-1.1, Device-1.2)
+    _BACKUP_SUFFIX_RE = re.compile(r'\.\d+$')
+
     def _get_filename(self, hostname: str) -> str:
         """Get safe filename for device"""
         # Remove any unsafe characters
-        safe_name = ''.join(c for c in hostname if c.isalnum() or c in '-_')
+        safe_name = self._UNSAFE_CHARS_RE.sub('', hostname)
         # Strip leading hyphens/underscores to avoid bash command issues
         safe_name = safe_name.lstrip('-_')
         # Fallback if name is empty after sanitization
@@ -143,82 +310,174 @@ class DeviceTracker:
             safe_name = 'unknown-device'
         return safe_name
     
-    def add_or_update_device(self, mac: str, ip: str, hostname: str):
+    def _append_line(self, filename: str, line: str):
+        """Append one CSV line to a device log via its cached handle
+        (call with self.lock held)"""
+        f = self._append_handles.get(filename)
+        if f is None:
+            filepath = os.path.join(self.devices_dir, filename)
+            f = open(filepath, 'a')
+            self._append_handles[filename] = f
+
+        # Rotate before the log outgrows its size cap (append handles
+        # report the current size via tell())
+        if self.max_log_bytes and f.tell() >= self.max_log_bytes:
+            f.close()
+            del self._append_handles[filename]
+            self._rotate(filename)
+            f = open(os.path.join(self.devices_dir, filename), 'a')
+            self._append_handles[filename] = f
+
+        f.write(line)
+        # Flush so the analysis scripts always see complete lines
+        f.flush()
+
+    def _rotate(self, filename: str):
+        """Roll filename -> filename.1 -> filename.2 ... dropping the oldest
+        (call with self.lock held)"""
+        filepath = os.path.join(self.devices_dir, filename)
+        oldest = f"{filepath}.{self.backup_count}"
+        if os.path.exists(oldest):
+            os.remove(oldest)
+        for i in range(self.backup_count - 1, 0, -1):
+            backup = f"{filepath}.{i}"
+            if os.path.exists(backup):
+                os.replace(backup, f"{filepath}.{i + 1}")
+        os.replace(filepath, f"{filepath}.1")
+        logger.info(f"Rotated device log {filename} (> {self.max_log_bytes} bytes)")
+
+    def close(self):
+        """Close cached device log handles (on shutdown)"""
+        with self.lock:
+            for f in self._append_handles.values():
+                try:
+                    f.close()
+                except OSError:
+                    pass
+            self._append_handles.clear()
+
+    def _add_or_update_locked(self, mac: str, ip: str, hostname: str,
+                              now: datetime):
+        """Add or update one device (call with self.lock held)"""
+        # Check if device exists
+        if mac in self.device_states:
+            # Update IP if changed
+            self.device_states[mac]['ip'] = ip
+        else:
+            # New device
+            self.device_states[mac] = {
+                'hostname': hostname,
+                'ip': ip,
+                'status': 'online',
+                'last_change': now
+            }
+
+            # Create new file with initial entry
+            filename = self._get_filename(hostname)
+            self._append_line(filename, f"{now.isoformat()},{ip},{mac},online,0\n")
+
+            logger.info(f"New device discovered: {hostname} ({mac}) at {ip}")
+
+    def _update_status_locked(self, mac: str, new_status: str,
+                              now: datetime) -> bool:
+        """Update one device's status (call with self.lock held).
+        Returns True if the status changed"""
+        if mac not in self.device_states:
+            return False
+
+        device = self.device_states[mac]
+        old_status = device['status']
+
+        # Ensure device file exists (safety check); if it was removed
+        # out from under us, drop any handle to the unlinked inode
+        filename = self._get_filename(device['hostname'])
+        filepath = os.path.join(self.devices_dir, filename)
+        if not os.path.exists(filepath):
+            logger.warning(f"Device file missing for {device['hostname']}, creating empty file")
+            stale = self._append_handles.pop(filename, None)
+            if stale is not None:
+                stale.close()
+            with open(filepath, 'w') as f:
+                pass  # Create empty file
+
+        # Only log if status actually changed
+        if old_status == new_status:
+            return False
+
+        last_change = device['last_change']
+        interval_seconds = (now - last_change).total_seconds()
+
+        # Update state
+        device['status'] = new_status
+        device['last_change'] = now
+
+        # Append to file
+        self._append_line(
+            filename,
+            f"{now.isoformat()},{device['ip']},{mac},{new_status},{interval_seconds:.1f}\n")
+
+        logger.info(f"Device {device['hostname']} ({mac}): {old_status} -> {new_status} (after {interval_seconds:.1f}s)")
+        return True
+
+    def add_or_update_device(self, mac: str, ip: str, hostname: str,
+                             now: datetime = None):
         """Add new device or update existing one"""
         with self.lock:
-            now = datetime.now()
-            
-            # Check if device exists
-            if mac in self.device_states:
-                # Update IP if changed
-                self.device_states[mac]['ip'] = ip
-            else:
-                # New device
-                self.device_states[mac] = {
-                    'hostname': hostname,
-                    'ip': ip,
-                    'status': 'online',
-                    'last_change': now
-                }
-                
-                # Create new file with initial entry
-                filename = self._get_filename(hostname)
-                filepath = os.path.join(self.devices_dir, filename)
-                
-                with open(filepath, 'a') as f:
-                    f.write(f"{now.isoformat()},{ip},{mac},online,0\n")
-                
-                logger.info(f"New device discovered: {hostname} ({mac}) at {ip}")
-    
-    def update_device_status(self, mac: str, new_status: str):
+            if now is None:
+                now = datetime.now()
+            self._add_or_update_locked(mac, ip, hostname, now)
+            self._publish_snapshot()
+
+    def update_device_status(self, mac: str, new_status: str,
+                             now: datetime = None):
         """Update device online/offline status"""
         with self.lock:
-            if mac not in self.device_states:
-                return
-
-            device = self.device_states[mac]
-            old_status = device['status']
+            if now is None:
+                now = datetime.now()
+            if self._update_status_locked(mac, new_status, now):
+                self._publish_snapshot()
 
-            # Ensure device file exists (safety check)
-            filename = self._get_filename(device['hostname'])
-            filepath = os.path.join(self.devices_dir, filename)
-            if not os.path.exists(filepath):
-                logger.warning(f"Device file missing for {device['hostname']}, creating empty file")
-                with open(filepath, 'w') as f:
-                    pass  # Create empty file
-            
-            # Only log if status actually changed
-            if old_status != new_status:
+    def update_devices(self, devices: Dict[str, tuple], now: datetime = None):
+        """Record one scan's worth of {mac: (ip, hostname)} results,
+        taking the lock once for the whole batch instead of twice per
+        device, and publishing a single snapshot at the end"""
+        with self.lock:
+            if now is None:
                 now = datetime.now()
-                last_change = device['last_change']
-                interval_seconds = (now - last_change).total_seconds()
-                
-                # Update state
-                device['status'] = new_status
-                device['last_change'] = now
-                
-                # Append to file
-                filename = self._get_filename(device['hostname'])
-                filepath = os.path.join(self.devices_dir, filename)
-                
-                with open(filepath, 'a') as f:
-                    f.write(f"{now.isoformat()},{device['ip']},{mac},{new_status},{interval_seconds:.1f}\n")
-                
-                logger.info(f"Device {device['hostname']} ({mac}): {old_status} -> {new_status} (after {interval_seconds:.1f}s)")
+            for mac, (ip, hostname) in devices.items():
+                self._add_or_update_locked(mac, ip, hostname, now)
+                self._update_status_locked(mac, 'online', now)
+            self._publish_snapshot()
     
     def get_all_devices(self) -> list:
-        """Get all known devices"""
-        with self.lock:
-            return [(mac, data['ip'], data['hostname'], data['status']) 
-                    for mac, data in self.device_states.items()]
+        """Get all known devices (lock-free snapshot read)"""
+        # Reference assignment is atomic in CPython, so readers get a
+        # consistent (if slightly stale) view without blocking writers
+        return list(self._devices_snapshot)
 
 
 class NetworkScanner:
     """Network discovery using ARP scan"""
-    
-    def __init__(self, subnet: str):
+
+    # Reverse-DNS results are stable enough to reuse for an hour
+    DNS_TTL_SECONDS = 3600
+
+    # Hard wall-clock cap on one arp-scan run before falling back to nmap
+    SCAN_TIMEOUT_SECONDS = 120
+
+    # Matches "IP<whitespace>MAC" pairs anywhere in scan output; compiled
+    # once so the per-scan loop doesn't re-split every line
+    SCAN_LINE_RE = re.compile(r'(\d+\.\d+\.\d+\.\d+)\s+([0-9A-Fa-f]{2}(?::[0-9A-Fa-f]{2}){5})')
+
+    # Host lines in nmap's greppable (-oG) output
+    NMAP_HOST_RE = re.compile(r'^Host:\s+(\d+\.\d+\.\d+\.\d+)', re.M)
+
+    def __init__(self, subnet: str, common_vendors: dict = None,
+                 vendor_cache_file: str = None):
         self.subnet = subnet
-        self.mac_lookup = MacVendorLookup()
+        self.mac_lookup = MacVendorLookup(common_vendors=common_vendors,
+                                          cache_file=vendor_cache_file)
+        self._dns_cache = {}  # {ip: (hostname_or_None, expiry_monotonic)}
     
     def scan(self) -> Dict[str, tuple]:
         """
@@ -228,23 +487,50 @@ class NetworkScanner:
         devices = {}
         
         try:
-            result = subprocess.run(
-                ['sudo', 'arp-scan', '--interface=eth0', self.subnet],
-                capture_output=True,
-                text=True,
-                timeout=120
-            )
-            
-            for line in result.stdout.split('\n'):
-                parts = line.split()
-                if len(parts) >= 2 and ':' in parts[1]:
-                    ip = parts[0]
-                    mac = parts[1].lower()
-                    
-                    dns_hostname = self._get_hostname(ip)
-                    hostname = self.mac_lookup.generate_hostname(mac, ip, dns_hostname)
-                    devices[mac] = (ip, hostname)
-            
+            # --plain --quiet emits only "IP<tab>MAC" lines for responding
+            # hosts - no header/footer/vendor text to skip over.
+            # Stream stdout so hosts are parsed as they answer, selecting
+            # on the pipe against a hard deadline so a wedged arp-scan
+            # can't block the discovery thread forever
+            cmd = ['sudo', 'arp-scan', '--interface=eth0', '--plain', '--quiet', self.subnet]
+            pairs = []
+            pending = b''
+            deadline = time.monotonic() + self.SCAN_TIMEOUT_SECONDS
+            with subprocess.Popen(cmd, stdout=subprocess.PIPE) as proc:
+                with selectors.DefaultSelector() as sel:
+                    sel.register(proc.stdout, selectors.EVENT_READ)
+                    while True:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            proc.kill()
+                            raise subprocess.TimeoutExpired(cmd, self.SCAN_TIMEOUT_SECONDS)
+                        if not sel.select(remaining):
+                            continue  # nothing readable yet; re-check deadline
+                        chunk = os.read(proc.stdout.fileno(), 65536)
+                        if not chunk:
+                            break  # EOF - scan finished
+                        pending += chunk
+                        lines = pending.split(b'\n')
+                        pending = lines.pop()  # keep any partial last line
+                        for line in lines:
+                            m = self.SCAN_LINE_RE.search(line.decode('ascii', 'replace'))
+                            if m:
+                                pairs.append((m.group(1), m.group(2).lower()))
+                if pending:
+                    m = self.SCAN_LINE_RE.search(pending.decode('ascii', 'replace'))
+                    if m:
+                        pairs.append((m.group(1), m.group(2).lower()))
+                try:
+                    proc.wait(timeout=max(1.0, deadline - time.monotonic()))
+                except subprocess.TimeoutExpired:
+                    proc.kill()
+                    raise
+
+            for (ip, mac), dns_hostname in zip(pairs, self._resolve_hostnames(
+                    [ip for ip, _ in pairs])):
+                hostname = self.mac_lookup.generate_hostname(mac, ip, dns_hostname)
+                devices[mac] = (ip, hostname)
+
         except (subprocess.TimeoutExpired, FileNotFoundError):
             logger.warning("arp-scan failed, falling back to nmap")
             devices = self._nmap_scan()
@@ -262,69 +548,92 @@ class NetworkScanner:
                 text=True,
                 timeout=300
             )
-            
-            for line in result.stdout.split('\n'):
-                if 'Host:' in line:
-                    parts = line.split()
-                    ip = parts[1]
-                    
-                    mac = self._get_mac(ip)
-                    if mac:
-                        dns_hostname = self._get_hostname(ip)
-                        hostname = self.mac_lookup.generate_hostname(mac, ip, dns_hostname)
-                        devices[mac] = (ip, hostname)
-        
+
+            # One ARP cache read for the whole scan instead of an 'arp'
+            # subprocess per host
+            arp_cache = self._read_arp_cache()
+
+            pairs = []
+            for m in self.NMAP_HOST_RE.finditer(result.stdout):
+                ip = m.group(1)
+                mac = arp_cache.get(ip)
+                if mac:
+                    pairs.append((ip, mac))
+
+            for (ip, mac), dns_hostname in zip(pairs, self._resolve_hostnames(
+                    [ip for ip, _ in pairs])):
+                hostname = self.mac_lookup.generate_hostname(mac, ip, dns_hostname)
+                devices[mac] = (ip, hostname)
+
         except subprocess.TimeoutExpired:
             logger.error("Nmap scan timeout")
         
         return devices
     
-    def _get_mac(self, ip: str) -> Optional[str]:
-        """Get MAC address from IP using ARP cache"""
+    def _resolve_hostnames(self, ips: list) -> list:
+        """Resolve hostnames for many IPs concurrently - DNS stragglers
+        block for seconds each and would otherwise serialize the scan"""
+        if not ips:
+            return []
+        with ThreadPoolExecutor(max_workers=min(32, len(ips)),
+                                thread_name_prefix='dns') as executor:
+            return list(executor.map(self._get_hostname, ips))
+
+    def _read_arp_cache(self) -> Dict[str, str]:
+        """Read the kernel ARP cache in one pass, returning {ip: mac}"""
+        ip_to_mac = {}
         try:
-            result = subprocess.run(
-                ['arp', '-n', ip],
-                capture_output=True,
-                text=True
-            )
-            
-            for line in result.stdout.split('\n'):
-                if ip in line:
+            with open('/proc/net/arp') as f:
+                next(f)  # skip header row
+                for line in f:
                     parts = line.split()
-                    if len(parts) >= 3 and ':' in parts[2]:
-                        return parts[2].lower()
-        except:
-            pass
-        return None
-    
+                    if len(parts) >= 4 and ':' in parts[3] and parts[3] != '00:00:00:00:00:00':
+                        ip_to_mac[parts[0]] = parts[3].lower()
+        except OSError as e:
+            logger.warning(f"Could not read /proc/net/arp: {e}")
+        return ip_to_mac
+
     def _get_hostname(self, ip: str) -> Optional[str]:
-        """Try to resolve hostname from IP"""
+        """Try to resolve hostname from IP (reverse DNS via libc, no fork)"""
+        cached = self._dns_cache.get(ip)
+        if cached is not None and time.monotonic() < cached[1]:
+            return cached[0]
+
         try:
-            result = subprocess.run(
-                ['host', ip],
-                capture_output=True,
-                text=True,
-                timeout=2
-            )
-            
-            for line in result.stdout.split('\n'):
-                if 'domain name pointer' in line:
-                    hostname = line.split()[-1].rstrip('.')
-                    return hostname
-        except:
-            pass
-        return None
+            hostname = socket.gethostbyaddr(ip)[0].rstrip('.')
+        except OSError:
+            hostname = None
+
+        self._dns_cache[ip] = (hostname, time.monotonic() + self.DNS_TTL_SECONDS)
+        return hostname
 
 
 class DevicePinger:
     """Fast ping checking for known devices"""
 
+    # Set when icmplib can't ping here at all (e.g. net.ipv4.ping_group_range
+    # doesn't cover this user) so every pinger sticks to the subprocess
+    # fallback after a single warning instead of reporting devices offline
+    _icmplib_failed = False
+
     def __init__(self, timeout_seconds: int = 2, ping_count: int = 1):
         self.timeout_seconds = timeout_seconds
         self.ping_count = ping_count
 
     def is_online(self, ip: str) -> bool:
         """Quick ping check"""
+        if icmp_ping is not None and not DevicePinger._icmplib_failed:
+            try:
+                host = icmp_ping(ip, count=self.ping_count,
+                                 timeout=self.timeout_seconds, privileged=False)
+                return host.is_alive
+            except Exception as e:
+                # Permission/setup problem, not an unreachable host (those
+                # come back as is_alive=False) - use the fallback instead
+                DevicePinger._icmplib_failed = True
+                logger.warning(f"icmplib ping unavailable ({e}), using subprocess ping")
+
+        # Fallback: external ping (one fork+exec per check)
         try:
             result = subprocess.run(
                 ['ping', '-c', str(self.ping_count), '-W', str(self.timeout_seconds), ip],
@@ -339,21 +648,66 @@ class DevicePinger:
 class NetworkMonitor:
     """Main monitor coordinating discovery and polling threads"""
     
-    def __init__(self, config_path='config.json'):
-        with open(config_path, 'r') as f:
-            self.config = json.load(f)
+    def __init__(self, config_path='config.json', config: dict = None):
+        if config is not None:
+            # Pre-built config (tests, embedding) - no file round-trip
+            self.config = config
+        else:
+            with open(config_path, 'rb') as f:
+                self.config = _json_loads(f.read())
 
         # Setup logging with optional file output
         self._setup_logging()
 
-        self.tracker = DeviceTracker(devices_dir=self.config.get('devices_dir', 'devices'))
-        self.scanner = NetworkScanner(self.config['subnet'])
+        # Compile device_overrides patterns once; _get_device_config runs
+        # them for every device on every poll cycle. Keys are usually
+        # plain vendor prefixes ("Espressif.*", "GoogleInc", ".*"), which
+        # re.match treats as prefix tests anyway - those short-circuit to
+        # str.startswith; anything more exotic keeps full regex matching
+        self._override_patterns = []
+        for pattern, overrides in self.config.get('device_overrides', {}).items():
+            literal = re.fullmatch(r'([\w-]*)(\.\*)?', pattern)
+            if literal:
+                prefix = literal.group(1)
+                match_fn = lambda vendor, _p=prefix: vendor.startswith(_p)
+            else:
+                match_fn = re.compile(pattern).match
+            self._override_patterns.append((match_fn, pattern, overrides))
+
+        # Hostnames repeat every cycle, so the merged override dict is
+        # computed once per hostname and reused
+        self._device_config_cache = {}
+
+        self.tracker = DeviceTracker(
+            devices_dir=self.config.get('devices_dir', 'devices'),
+            max_log_bytes=self.config.get('max_device_log_bytes', 0),
+            backup_count=self.config.get('device_log_backup_count', 3))
+        self.scanner = NetworkScanner(
+            self.config['subnet'],
+            common_vendors=self.config.get('common_vendors'),
+            vendor_cache_file=self.config.get('vendor_cache_file', 'vendor_cache.json'))
+
+        # Seed hostname state from disk so restarts keep existing names
+        self.scanner.mac_lookup.seed_known_hostnames(
+            {mac: hostname for mac, _, hostname, _ in self.tracker.get_all_devices()})
         self.pinger = DevicePinger(
             timeout_seconds=self.config.get('ping_timeout_seconds', 2),
             ping_count=self.config.get('ping_count', 1)
         )
         self.running = False
 
+        # One long-lived pool for ping checks - spinning up a fresh
+        # executor every polling cycle cost thread creation each time
+        self._ping_executor = ThreadPoolExecutor(
+            max_workers=self.config.get('parallel_ping_workers', 10),
+            thread_name_prefix='ping')
+
+        # Adaptive polling: devices that keep the same status get pinged
+        # less and less often, up to this cap; any change resets them
+        self.max_poll_backoff = self.config.get('max_poll_backoff_seconds', 1800)
+        self._next_check = {}     # {mac: monotonic time of next allowed ping}
+        self._stable_streak = {}  # {mac: consecutive polls with unchanged status}
+
     def _setup_logging(self):
         """Configure logging based on config (file logging is optional)"""
         log_level = getattr(logging, self.config.get('log_level', 'INFO').upper())
@@ -399,9 +753,9 @@ class NetworkMonitor:
                 devices = self.scanner.scan()
                 logger.info(f"Scan complete: found {len(devices)} devices")
 
-                for mac, (ip, hostname) in devices.items():
-                    self.tracker.add_or_update_device(mac, ip, hostname)
-                    self.tracker.update_device_status(mac, 'online')
+                # One batch update: single lock acquisition and one shared
+                # timestamp for every device seen in this scan
+                self.tracker.update_devices(devices, now=datetime.now())
 
                 # Sleep with periodic trigger file checks for responsiveness
                 interval = self.config['discovery_interval_seconds']
@@ -436,6 +790,10 @@ class NetworkMonitor:
         Returns:
             Merged config dict with device-specific overrides applied
         """
+        cached = self._device_config_cache.get(hostname)
+        if cached is not None:
+            return cached
+
         # Start with base config
         device_config = {}
 
@@ -443,23 +801,19 @@ class NetworkMonitor:
         # Hostname format is typically "VendorName-MACADDR" or "VendorName-MACADDR-N"
         vendor = hostname.rsplit('-', 1)[0] if '-' in hostname else hostname
 
-        # Check device_overrides for matching patterns
-        device_overrides = self.config.get('device_overrides', {})
-        for pattern, overrides in device_overrides.items():
-            if re.match(pattern, vendor):
+        # Check precompiled device_overrides patterns
+        for match_fn, pattern, overrides in self._override_patterns:
+            if match_fn(vendor):
                 # Pattern matches - merge these overrides
                 device_config.update(overrides)
                 logger.debug(f"Device {hostname} matched pattern '{pattern}', applying overrides: {overrides}")
                 break  # First match wins
 
+        self._device_config_cache[hostname] = device_config
         return device_config
 
-    def _check_device(self, device_info, stagger_delay=0.0):
+    def _check_device(self, device_info):
         """Check a single device (for parallel execution)"""
-        # Stagger start time to spread network/CPU load
-        if stagger_delay > 0:
-            time.sleep(stagger_delay)
-
         mac, ip, hostname, current_status = device_info
 
         # Get device-specific config (merged with overrides)
@@ -481,7 +835,7 @@ class NetworkMonitor:
         return (mac, new_status, current_status)
 
     def polling_thread(self):
-        """Thread for fast polling of known devices (parallel with staggered start)"""
+        """Thread for fast polling of known devices (parallel)"""
         max_workers = self.config.get('parallel_ping_workers', 10)
 
         logger.info(f"Polling thread started (interval: {self.config['polling_interval_seconds']}s, "
@@ -495,48 +849,56 @@ class NetworkMonitor:
                     time.sleep(self.config['polling_interval_seconds'])
                     continue
 
-                # Filter out devices with disable_polling=true
+                # Filter out devices with disable_polling=true or that are
+                # backed off because their status hasn't changed in a while
+                now = time.monotonic()
                 devices_to_poll = []
                 for device in devices:
                     mac, ip, hostname, current_status = device
                     device_config = self._get_device_config(hostname)
-                    if not device_config.get('disable_polling', False):
-                        devices_to_poll.append(device)
-                    else:
+                    if device_config.get('disable_polling', False):
                         logger.debug(f"Skipping polling for {hostname} (disable_polling=true)")
+                    elif now < self._next_check.get(mac, 0):
+                        logger.debug(f"Skipping polling for {hostname} (stable, backed off)")
+                    else:
+                        devices_to_poll.append(device)
 
                 if not devices_to_poll:
                     logger.debug(f"No devices to poll (all {len(devices)} devices have disable_polling=true)")
                     time.sleep(self.config['polling_interval_seconds'])
                     continue
 
-                # Calculate stagger delay to spread pings across polling interval
-                # stagger = interval / num_devices (in seconds)
                 num_devices = len(devices_to_poll)
-                polling_interval = self.config['polling_interval_seconds']
-                stagger_delay = polling_interval / num_devices if num_devices > 0 else 0
-
-                stagger_ms = stagger_delay * 1000.0
-                logger.debug(f"Polling {num_devices} devices with {stagger_ms:.1f}ms stagger ({len(devices) - num_devices} skipped)")
-
-                # Ping all devices in parallel with staggered start
-                with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                    # Submit all ping tasks with incremental stagger delays
-                    future_to_device = {}
-                    for i, device in enumerate(devices_to_poll):
-                        delay = i * stagger_delay
-                        future = executor.submit(self._check_device, device, delay)
-                        future_to_device[future] = device
-
-                    # Process results as they complete
-                    for future in as_completed(future_to_device):
-                        try:
-                            mac, new_status, current_status = future.result()
-                            if new_status != current_status:
-                                self.tracker.update_device_status(mac, new_status)
-                        except Exception as e:
-                            device = future_to_device[future]
-                            logger.error(f"Error checking device {device[2]}: {e}")
+                logger.debug(f"Polling {num_devices} devices ({len(devices) - num_devices} skipped)")
+
+                # Ping all devices in parallel on the persistent executor;
+                # the bounded worker count is enough pacing - sleeping in
+                # workers just held executor slots idle
+                future_to_device = {}
+                for device in devices_to_poll:
+                    future = self._ping_executor.submit(self._check_device, device)
+                    future_to_device[future] = device
+
+                # Process results as they complete
+                for future in as_completed(future_to_device):
+                    try:
+                        mac, new_status, current_status = future.result()
+                        if new_status != current_status:
+                            self.tracker.update_device_status(mac, new_status)
+                            # Changed: poll at full rate again
+                            self._stable_streak[mac] = 0
+                            self._next_check[mac] = 0.0
+                        else:
+                            # Unchanged: double the delay to the next ping
+                            streak = self._stable_streak.get(mac, 0) + 1
+                            self._stable_streak[mac] = streak
+                            backoff = min(
+                                self.config['polling_interval_seconds'] * 2 ** streak,
+                                self.max_poll_backoff)
+                            self._next_check[mac] = time.monotonic() + backoff
+                    except Exception as e:
+                        device = future_to_device[future]
+                        logger.error(f"Error checking device {device[2]}: {e}")
 
                 time.sleep(self.config['polling_interval_seconds'])
 
@@ -572,6 +934,8 @@ class NetworkMonitor:
             logger.info("Shutting down...")
             self.running = False
             time.sleep(2)
+            self._ping_executor.shutdown(wait=False)
+            self.tracker.close()
 
 
 if __name__ == '__main__':
@@ -22,38 +22,30 @@ def test_imports():
     assert hasattr(monitor, 'MacVendorLookup')
 
 
-def test_config_loading():
+def test_config_loading(tmp_path):
     """Test that config file can be loaded"""
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-        config = {
-            "subnet": "192.168.1.0/24",
-            "interface": "eth0",
-            "discovery_interval_seconds": 30,
-            "polling_interval_seconds": 3,
-            "ping_timeout_seconds": 2,
-            "ping_count": 3,
-            "parallel_ping_workers": 10,
-            "scanner": "arp-scan",
-            "prepopulate_arp": True,
-            "devices_dir": "test_devices",
-            "log_level": "INFO",
-            "common_vendors": {}
-        }
-        json.dump(config, f)
-        config_path = f.name
-
-    try:
-        # Test NetworkMonitor initialization with custom config
-        nm = monitor.NetworkMonitor(config_path=config_path)
-        assert nm.config['subnet'] == "192.168.1.0/24"
-        assert nm.config['parallel_ping_workers'] == 10
-        assert nm.config['ping_count'] == 3
-    finally:
-        os.unlink(config_path)
-        # Clean up test devices directory if created
-        if os.path.exists("test_devices"):
-            import shutil
-            shutil.rmtree("test_devices")
+    config = {
+        "subnet": "192.168.1.0/24",
+        "interface": "eth0",
+        "discovery_interval_seconds": 30,
+        "polling_interval_seconds": 3,
+        "ping_timeout_seconds": 2,
+        "ping_count": 3,
+        "parallel_ping_workers": 10,
+        "scanner": "arp-scan",
+        "prepopulate_arp": True,
+        "devices_dir": str(tmp_path / "devices"),
+        "log_level": "INFO",
+        "common_vendors": {}
+    }
+    config_path = tmp_path / "config.json"
+    config_path.write_text(json.dumps(config))
+
+    # Test NetworkMonitor initialization with custom config
+    nm = monitor.NetworkMonitor(config_path=str(config_path))
+    assert nm.config['subnet'] == "192.168.1.0/24"
+    assert nm.config['parallel_ping_workers'] == 10
+    assert nm.config['ping_count'] == 3
 
 
 def test_device_pinger_initialization():
@@ -112,9 +104,44 @@ def test_mac_vendor_lookup():
     assert isinstance(lookup.hostname_counts, dict)
 
 
-def test_network_monitor_initialization():
+def test_network_monitor_initialization(tmp_path):
     """Test NetworkMonitor initializes all components"""
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
+    config = {
+        "subnet": "192.168.1.0/24",
+        "interface": "eth0",
+        "discovery_interval_seconds": 30,
+        "polling_interval_seconds": 3,
+        "ping_timeout_seconds": 2,
+        "ping_count": 3,
+        "parallel_ping_workers": 5,
+        "scanner": "arp-scan",
+        "prepopulate_arp": True,
+        "devices_dir": str(tmp_path / "devices"),
+        "log_level": "INFO",
+        "common_vendors": {}
+    }
+
+    # Config injected directly - no JSON round-trip needed
+    nm = monitor.NetworkMonitor(config=config)
+
+    # Check all components initialized
+    assert nm.tracker is not None
+    assert nm.scanner is not None
+    assert nm.pinger is not None
+    assert nm.running == False
+
+    # Check pinger got config values
+    assert nm.pinger.timeout_seconds == 2
+    assert nm.pinger.ping_count == 3
+
+
+@pytest.fixture
+def make_monitor(tmp_path):
+    """Build a NetworkMonitor from the standard test config, optionally
+    overriding/adding keys. The config dict is injected directly (no
+    JSON round-trip); the devices dir lives under tmp_path, which pytest
+    cleans up in one sweep"""
+    def _make(**extra):
         config = {
             "subnet": "192.168.1.0/24",
             "interface": "eth0",
@@ -125,291 +152,117 @@ def test_network_monitor_initialization():
             "parallel_ping_workers": 5,
             "scanner": "arp-scan",
             "prepopulate_arp": True,
-            "devices_dir": "test_devices_nm",
+            "devices_dir": str(tmp_path / "devices"),
             "log_level": "INFO",
             "common_vendors": {}
         }
-        json.dump(config, f)
-        config_path = f.name
+        config.update(extra)
+        return monitor.NetworkMonitor(config=config)
+    return _make
 
-    try:
-        nm = monitor.NetworkMonitor(config_path=config_path)
 
-        # Check all components initialized
-        assert nm.tracker is not None
-        assert nm.scanner is not None
-        assert nm.pinger is not None
-        assert nm.running == False
-
-        # Check pinger got config values
-        assert nm.pinger.timeout_seconds == 2
-        assert nm.pinger.ping_count == 3
-
-    finally:
-        os.unlink(config_path)
-        if os.path.exists("test_devices_nm"):
-            import shutil
-            shutil.rmtree("test_devices_nm")
-
-
-def test_device_config_no_overrides():
+def test_device_config_no_overrides(make_monitor):
     """Test _get_device_config with no device_overrides configured"""
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-        config = {
-            "subnet": "192.168.1.0/24",
-            "interface": "eth0",
-            "discovery_interval_seconds": 30,
-            "polling_interval_seconds": 3,
-            "ping_timeout_seconds": 2,
-            "ping_count": 3,
-            "parallel_ping_workers": 5,
-            "scanner": "arp-scan",
-            "prepopulate_arp": True,
-            "devices_dir": "test_devices_cfg1",
-            "log_level": "INFO",
-            "common_vendors": {}
-            # No device_overrides
-        }
-        json.dump(config, f)
-        config_path = f.name
-
-    try:
-        nm = monitor.NetworkMonitor(config_path=config_path)
+    nm = make_monitor()
 
-        # With no overrides, should return empty dict
-        device_config = nm._get_device_config("EspressifInc-4DE4")
-        assert device_config == {}
+    # With no overrides, should return empty dict
+    device_config = nm._get_device_config("EspressifInc-4DE4")
+    assert device_config == {}
 
-        device_config = nm._get_device_config("TuyaSmartInc-F412")
-        assert device_config == {}
+    device_config = nm._get_device_config("TuyaSmartInc-F412")
+    assert device_config == {}
 
-    finally:
-        os.unlink(config_path)
-        if os.path.exists("test_devices_cfg1"):
-            import shutil
-            shutil.rmtree("test_devices_cfg1")
 
-
-def test_device_config_with_matching_pattern():
+def test_device_config_with_matching_pattern(make_monitor):
     """Test _get_device_config with matching override patterns"""
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-        config = {
-            "subnet": "192.168.1.0/24",
-            "interface": "eth0",
-            "discovery_interval_seconds": 30,
-            "polling_interval_seconds": 3,
-            "ping_timeout_seconds": 2,
-            "ping_count": 3,
-            "parallel_ping_workers": 5,
-            "scanner": "arp-scan",
-            "prepopulate_arp": True,
-            "devices_dir": "test_devices_cfg2",
-            "log_level": "INFO",
-            "common_vendors": {},
-            "device_overrides": {
-                "Espressif.*": {
-                    "ping_count": 5,
-                    "ping_timeout_seconds": 5
-                },
-                "Tuya.*": {
-                    "polling_interval_seconds": 60
-                }
-            }
+    nm = make_monitor(device_overrides={
+        "Espressif.*": {
+            "ping_count": 5,
+            "ping_timeout_seconds": 5
+        },
+        "Tuya.*": {
+            "polling_interval_seconds": 60
         }
-        json.dump(config, f)
-        config_path = f.name
+    })
 
-    try:
-        nm = monitor.NetworkMonitor(config_path=config_path)
+    # Test Espressif pattern match
+    device_config = nm._get_device_config("EspressifInc-4DE4")
+    assert device_config['ping_count'] == 5
+    assert device_config['ping_timeout_seconds'] == 5
+    assert 'polling_interval_seconds' not in device_config  # Only specified overrides
 
-        # Test Espressif pattern match
-        device_config = nm._get_device_config("EspressifInc-4DE4")
-        assert device_config['ping_count'] == 5
-        assert device_config['ping_timeout_seconds'] == 5
-        assert 'polling_interval_seconds' not in device_config  # Only specified overrides
+    # Test Tuya pattern match
+    device_config = nm._get_device_config("TuyaSmartInc-F412")
+    assert device_config['polling_interval_seconds'] == 60
+    assert 'ping_count' not in device_config
 
-        # Test Tuya pattern match
-        device_config = nm._get_device_config("TuyaSmartInc-F412")
-        assert device_config['polling_interval_seconds'] == 60
-        assert 'ping_count' not in device_config
+    # Test non-matching vendor
+    device_config = nm._get_device_config("GoogleInc-1234")
+    assert device_config == {}
 
-        # Test non-matching vendor
-        device_config = nm._get_device_config("GoogleInc-1234")
-        assert device_config == {}
 
-    finally:
-        os.unlink(config_path)
-        if os.path.exists("test_devices_cfg2"):
-            import shutil
-            shutil.rmtree("test_devices_cfg2")
-
-
-def test_device_config_vendor_extraction():
+def test_device_config_vendor_extraction(make_monitor):
     """Test that vendor is correctly extracted from hostname"""
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-        config = {
-            "subnet": "192.168.1.0/24",
-            "interface": "eth0",
-            "discovery_interval_seconds": 30,
-            "polling_interval_seconds": 3,
-            "ping_timeout_seconds": 2,
-            "ping_count": 3,
-            "parallel_ping_workers": 5,
-            "scanner": "arp-scan",
-            "prepopulate_arp": True,
-            "devices_dir": "test_devices_cfg3",
-            "log_level": "INFO",
-            "common_vendors": {},
-            "device_overrides": {
-                "GoogleInc": {
-                    "ping_count": 2
-                }
-            }
+    nm = make_monitor(device_overrides={
+        "GoogleInc": {
+            "ping_count": 2
         }
-        json.dump(config, f)
-        config_path = f.name
-
-    try:
-        nm = monitor.NetworkMonitor(config_path=config_path)
-
-        # Test simple hostname (VendorName-MAC)
-        device_config = nm._get_device_config("GoogleInc-1234")
-        assert device_config['ping_count'] == 2
+    })
 
-        # Test hostname with duplicate suffix (VendorName-MAC-2)
-        device_config = nm._get_device_config("GoogleInc-1234-2")
-        assert device_config['ping_count'] == 2
+    # Test simple hostname (VendorName-MAC)
+    device_config = nm._get_device_config("GoogleInc-1234")
+    assert device_config['ping_count'] == 2
 
-        # Test hostname with no hyphen
-        device_config = nm._get_device_config("GoogleInc")
-        assert device_config['ping_count'] == 2
+    # Test hostname with duplicate suffix (VendorName-MAC-2)
+    device_config = nm._get_device_config("GoogleInc-1234-2")
+    assert device_config['ping_count'] == 2
 
-    finally:
-        os.unlink(config_path)
-        if os.path.exists("test_devices_cfg3"):
-            import shutil
-            shutil.rmtree("test_devices_cfg3")
+    # Test hostname with no hyphen
+    device_config = nm._get_device_config("GoogleInc")
+    assert device_config['ping_count'] == 2
 
 
-def test_device_config_first_match_wins():
+def test_device_config_first_match_wins(make_monitor):
     """Test that first matching pattern wins when multiple patterns match"""
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-        config = {
-            "subnet": "192.168.1.0/24",
-            "interface": "eth0",
-            "discovery_interval_seconds": 30,
-            "polling_interval_seconds": 3,
-            "ping_timeout_seconds": 2,
-            "ping_count": 3,
-            "parallel_ping_workers": 5,
-            "scanner": "arp-scan",
-            "prepopulate_arp": True,
-            "devices_dir": "test_devices_cfg4",
-            "log_level": "INFO",
-            "common_vendors": {},
-            "device_overrides": {
-                "Espressif.*": {
-                    "ping_count": 5
-                },
-                ".*": {  # Matches everything
-                    "ping_count": 10
-                }
-            }
+    nm = make_monitor(device_overrides={
+        "Espressif.*": {
+            "ping_count": 5
+        },
+        ".*": {  # Matches everything
+            "ping_count": 10
         }
-        json.dump(config, f)
-        config_path = f.name
-
-    try:
-        nm = monitor.NetworkMonitor(config_path=config_path)
+    })
 
-        # Espressif should match first pattern, not the .* wildcard
-        device_config = nm._get_device_config("EspressifInc-4DE4")
-        assert device_config['ping_count'] == 5  # Not 10
+    # Espressif should match first pattern, not the .* wildcard
+    device_config = nm._get_device_config("EspressifInc-4DE4")
+    assert device_config['ping_count'] == 5  # Not 10
 
-        # Non-Espressif should match the .* wildcard
-        device_config = nm._get_device_config("GoogleInc-1234")
-        assert device_config['ping_count'] == 10
+    # Non-Espressif should match the .* wildcard
+    device_config = nm._get_device_config("GoogleInc-1234")
+    assert device_config['ping_count'] == 10
 
-    finally:
-        os.unlink(config_path)
-        if os.path.exists("test_devices_cfg4"):
-            import shutil
-            shutil.rmtree("test_devices_cfg4")
 
-
-def test_disable_polling_override():
+def test_disable_polling_override(make_monitor):
     """Test that disable_polling override prevents device from being polled"""
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-        config = {
-            "subnet": "192.168.1.0/24",
-            "interface": "eth0",
-            "discovery_interval_seconds": 30,
-            "polling_interval_seconds": 3,
-            "ping_timeout_seconds": 2,
-            "ping_count": 3,
-            "parallel_ping_workers": 5,
-            "scanner": "arp-scan",
-            "prepopulate_arp": True,
-            "devices_dir": "test_devices_cfg5",
-            "log_level": "INFO",
-            "common_vendors": {},
-            "device_overrides": {
-                "Google.*": {
-                    "disable_polling": True
-                }
-            }
+    nm = make_monitor(device_overrides={
+        "Google.*": {
+            "disable_polling": True
         }
-        json.dump(config, f)
-        config_path = f.name
+    })
 
-    try:
-        nm = monitor.NetworkMonitor(config_path=config_path)
+    # Google devices should have disable_polling=true
+    device_config = nm._get_device_config("GoogleInc-1234")
+    assert device_config.get('disable_polling') == True
 
-        # Google devices should have disable_polling=true
-        device_config = nm._get_device_config("GoogleInc-1234")
-        assert device_config.get('disable_polling') == True
+    # Non-Google devices should not have disable_polling set
+    device_config = nm._get_device_config("EspressifInc-4DE4")
+    assert device_config.get('disable_polling', False) == False
 
-        # Non-Google devices should not have disable_polling set
-        device_config = nm._get_device_config("EspressifInc-4DE4")
-        assert device_config.get('disable_polling', False) == False
 
-    finally:
-        os.unlink(config_path)
-        if os.path.exists("test_devices_cfg5"):
-            import shutil
-            shutil.rmtree("test_devices_cfg5")
-
-
-def test_discovery_trigger_file_config():
+def test_discovery_trigger_file_config(make_monitor):
     """Test that discovery_trigger_file config option is recognized"""
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-        config = {
-            "subnet": "192.168.1.0/24",
-            "interface": "eth0",
-            "discovery_interval_seconds": 30,
-            "polling_interval_seconds": 3,
-            "ping_timeout_seconds": 2,
-            "ping_count": 3,
-            "parallel_ping_workers": 5,
-            "scanner": "arp-scan",
-            "prepopulate_arp": True,
-            "devices_dir": "test_devices_cfg6",
-            "log_level": "INFO",
-            "common_vendors": {},
-            "discovery_trigger_file": "trigger-discovery"
-        }
-        json.dump(config, f)
-        config_path = f.name
-
-    try:
-        nm = monitor.NetworkMonitor(config_path=config_path)
-        assert nm.config.get('discovery_trigger_file') == "trigger-discovery"
-
-    finally:
-        os.unlink(config_path)
-        if os.path.exists("test_devices_cfg6"):
-            import shutil
-            shutil.rmtree("test_devices_cfg6")
+    nm = make_monitor(discovery_trigger_file="trigger-discovery")
+    assert nm.config.get('discovery_trigger_file') == "trigger-discovery"
 
 
 if __name__ == '__main__':
@@ -1,5 +1,6 @@
-from scapy.all import ARP, Ether, srp
 import bluetooth
+import json
+import subprocess
 import time
 import requests
 
@@ -11,8 +12,34 @@ PHONE_BT_MAC = "11:22:33:44:55:66"
 AUTOMATION_API_URL = "http://your-automation-system/api/device/Lab%20lights%20-%20Lab"
 API_TOKEN = "YOUR_API_TOKEN"
 
+# One session for all API calls - keeps the connection alive instead of
+# handshaking with the automation system on every trigger
+session = requests.Session()
+session.headers.update({"Authorization": f"Bearer {API_TOKEN}"})
+
 # Wi-Fi detection function
 def detect_wifi(target_mac):
+    # The kernel already tracks neighbours it has talked to - checking
+    # its table beats broadcasting 254 ARP requests. Only REACHABLE
+    # entries count: the kernel keeps STALE entries (MAC included)
+    # around long after the phone has left, so /proc/net/arp (which
+    # hides the state) would report presence forever
+    try:
+        result = subprocess.run(['ip', '-j', 'neigh'],
+                                capture_output=True, text=True, timeout=5)
+        if result.returncode == 0:
+            for entry in json.loads(result.stdout):
+                if (entry.get('lladdr', '').lower() == target_mac.lower()
+                        and 'REACHABLE' in entry.get('state', [])):
+                    return True
+    except (OSError, ValueError, subprocess.TimeoutExpired):
+        pass
+
+    # No trusted entry (absent or stale): fall back to an active sweep.
+    # scapy costs ~150ms and tens of MB to import, so only pull it in
+    # when the fast path misses
+    from scapy.all import ARP, Ether, srp
+
     ip_range = "192.168.1.1/24"  # Adjust to your network
     arp = ARP(pdst=ip_range)
     ether = Ether(dst="ff:ff:ff:ff:ff:ff")
@@ -35,22 +62,35 @@ def detect_bluetooth(target_mac):
 # Trigger lab lights ON
 def turn_on_lab_lights():
     payload = {"on": True}
-    headers = {"Authorization": f"Bearer {API_TOKEN}"}
-    response = requests.post(AUTOMATION_API_URL, json=payload, headers=headers)
+    response = session.post(AUTOMATION_API_URL, json=payload, timeout=5)
     if response.status_code == 200:
         print("💡 Lab lights turned ON")
     else:
         print(f"⚠️ Failed to turn on lights: {response.status_code}")
 
-# Main loop
+# Trigger lab lights OFF
+def turn_off_lab_lights():
+    payload = {"on": False}
+    response = session.post(AUTOMATION_API_URL, json=payload, timeout=5)
+    if response.status_code == 200:
+        print("💡 Lab lights turned OFF")
+    else:
+        print(f"⚠️ Failed to turn off lights: {response.status_code}")
+
+# Main loop - only talk to the API on arrive/leave transitions, not on
+# every cycle the phone happens to still be present
+last_present = None
 while True:
-    wifi_found = detect_wifi(PHONE_WIFI_MAC)
-    bt_found = detect_bluetooth(PHONE_BT_MAC)
+    present = detect_wifi(PHONE_WIFI_MAC) or detect_bluetooth(PHONE_BT_MAC)
 
-    if wifi_found or bt_found:
-        print("📱 Phone detected! Triggering lab lights...")
-        turn_on_lab_lights()
-    else:
-        print("❌ Phone not detected.")
+    if present != last_present:
+        if present:
+            print("📱 Phone detected! Triggering lab lights...")
+            turn_on_lab_lights()
+        else:
+            print("❌ Phone not detected.")
+            if last_present is not None:  # don't turn off on first cycle
+                turn_off_lab_lights()
+        last_present = present
 
     time.sleep(10)  # Check every 10 seconds